@@ -10,7 +10,7 @@ from sklearn.pipeline import Pipeline
 import sklearn
 from sklearn.impute import KNNImputer
 from sklearn.neighbors import KNeighborsClassifier
-from sklearn.model_selection import train_test_split # This is here, but dataset_setup also imports it locally. Consolidate if preferred.
+from sklearn.model_selection import train_test_split
 from sklearn.model_selection import ParameterGrid
 
 # Added imports for HalvingGridSearchCV
@@ -19,10 +19,69 @@ from sklearn.model_selection import HalvingGridSearchCV
 
 # Added imports for metrics
 from sklearn.metrics import precision_score, recall_score, f1_score, accuracy_score, roc_auc_score
-from sklearn.metrics import f1_score
+
+try:
+    import numba  #optional: compiles the per-column scaling kernel below
+except ImportError:
+    numba = None
 
 sklearn.set_config(transform_output="pandas")  #says pass pandas tables through pipeline instead of numpy matrices
 
+def _q25_50_75(arr: np.ndarray) -> Tuple[float, float, float]:
+    """
+    Return the 25th, 50th and 75th percentiles of arr, ignoring NaNs.
+
+    All three come from one np.quantile call (partition based selection), which
+    gives the same linear interpolation as pandas' Series.quantile/median but
+    without sorting the column once per statistic.
+    """
+    arr = np.asarray(arr, dtype=np.float64)
+    arr = arr[~np.isnan(arr)]
+    if arr.size == 0:
+        return np.nan, np.nan, np.nan  #pandas also returns NaN for an all-missing column
+    q1, med, q3 = np.quantile(arr, [0.25, 0.5, 0.75], method='linear')
+    return float(q1), float(med), float(q3)
+
+def _within(arr: np.ndarray, low: float, high: float) -> bool:
+    """Return True if every non-NaN value of arr lies in [low, high], i.e. clipping would change nothing."""
+    if arr.size == 0:
+        return True
+    # fmin/fmax skip NaNs without the all-NaN warnings of nanmin/nanmax; an all-NaN array gives NaN -> False
+    return bool(np.fmin.reduce(arr) >= low and np.fmax.reduce(arr) <= high)
+
+def _as_source_dtype(mapped: pd.Series, dtype: Any) -> pd.Series:
+    """
+    Return mapped cast back to the numeric dtype of its source column when that loses nothing.
+
+    Series.replace writes replacement values the column can hold (1.0 into int64, 20 into int32)
+    without changing its dtype; this gives a mapped column the same dtype replace would have kept.
+    """
+    if mapped.dtype == dtype or not (isinstance(dtype, np.dtype) and dtype.kind in 'iuf'
+                                     and isinstance(mapped.dtype, np.dtype) and mapped.dtype.kind in 'iuf'):
+        return mapped
+    values: np.ndarray = mapped.to_numpy()
+    with np.errstate(invalid='ignore', over='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  #NaN or out of range values don't survive the round trip anyway
+        cast: np.ndarray = values.astype(dtype)
+    return pd.Series(cast, index=mapped.index, name=mapped.name) if (cast == values).all() else mapped
+
+if numba is not None:
+    # fastmath is left off on purpose: it assumes no NaNs, and unimputed columns have them
+    @numba.njit(parallel=True, cache=True)
+    def _robust_scale(arr: np.ndarray, med: float, iqr: float) -> np.ndarray:
+        """Return (arr - med) / iqr in one fused, parallel pass without intermediate arrays."""
+        out = np.empty_like(arr)
+        for i in numba.prange(arr.size):
+            out[i] = (arr[i] - med) / iqr
+        return out
+else:
+    def _robust_scale(arr: np.ndarray, med: float, iqr: float) -> np.ndarray:
+        """Return (arr - med) / iqr with a single temporary array (numba not installed)."""
+        out = np.subtract(arr, med)
+        out /= iqr
+        return out
+
+
 class CustomMappingTransformer(BaseEstimator, TransformerMixin):
     """
     A transformer that maps values in a specified column according to a provided dictionary.
@@ -40,6 +99,8 @@ class CustomMappingTransformer(BaseEstimator, TransformerMixin):
         A dictionary defining the mapping from existing values to new values.
         Keys should be values present in the mapping_column, and values should
         be their desired replacements.
+    verbose : bool, default=False
+        If True, print warnings about keys and column values that have no counterpart.
 
     Attributes
     ----------
@@ -60,9 +121,28 @@ class CustomMappingTransformer(BaseEstimator, TransformerMixin):
     1        2
     2        3
     3        1
+
+    Values without a key, and missing values, are left as they are, and the
+    mapped values keep their type (no upcast to float), as with Series.replace:
+
+    >>> CustomMappingTransformer('category', {'A': 1}).fit_transform(df)['category'].tolist()
+    [1, 'B', 'C', 1]
+    >>> df = pd.DataFrame({'gender': ['Male', 'Female', None, 'Male']})
+    >>> CustomMappingTransformer('gender', {'Male': 0, 'Female': 1}).fit_transform(df)['gender'].tolist()
+    [0, 1, nan, 0]
+    >>> import numpy as np
+    >>> df = pd.DataFrame({'level': np.array([1, 2, 3], dtype=np.int32)})
+    >>> CustomMappingTransformer('level', {1: 10, 2: 20}).fit_transform(df)['level'].dtype
+    dtype('int32')
     """
 
-    def __init__(self, mapping_column: Union[str, int], mapping_dict: Dict[Hashable, Any]) -> None:
+    verbose = False  #default for instances pickled before verbose existed
+    _target_column_checked = False  #set per instance once fit has validated the input
+    _derived_from = None  #the mapping_dict object the lookups below were built from
+    _lut = None  #category code -> mapped value, set by fit for categorical columns
+    _lut_categories = None
+
+    def __init__(self, mapping_column: Union[str, int], mapping_dict: Dict[Hashable, Any], verbose: bool = False) -> None:
         """
         Initialize the CustomMappingTransformer.
 
@@ -72,6 +152,8 @@ class CustomMappingTransformer(BaseEstimator, TransformerMixin):
             The name (str) or position (int) of the column to apply the mapping to.
         mapping_dict : Dict[Hashable, Any]
             A dictionary defining the mapping from existing values to new values.
+        verbose : bool, default=False
+            If True, transform prints warnings about unmatched keys and values.
 
         Raises
         ------
@@ -81,13 +163,52 @@ class CustomMappingTransformer(BaseEstimator, TransformerMixin):
         assert isinstance(mapping_dict, dict), f'{self.__class__.__name__} constructor expected dictionary but got {type(mapping_dict)} instead.'
         self.mapping_dict: Dict[Hashable, Any] = mapping_dict
         self.mapping_column: Union[str, int] = mapping_column  #column to focus on
+        self.verbose: bool = verbose
+
+    def _derive_state(self) -> None:
+        """
+        (Re)build the lookups transform derives from mapping_dict.
+
+        They are rebuilt whenever mapping_dict is no longer the object they were
+        built from, so set_params/clone take effect and transformers pickled
+        before these attributes existed still work. A lookup table built by fit
+        for the old mapping is discarded along the way.
+        """
+        mapping_dict: Dict[Hashable, Any] = self.mapping_dict
+        self._mapping_keys = set(mapping_dict.keys())
+        self._lut = None
+        self._lut_categories = None
+
+        #a mapping that changes nothing lets transform hand back X untouched
+        self._is_empty = not mapping_dict
+        self._is_identity = all(k is v or (type(k) is type(v) and k == v) for k, v in mapping_dict.items())
+
+        #integer -> integer mappings (label encoding, binning) also get sorted key/value arrays,
+        #so transform can look up integer columns with np.searchsorted instead of hashing
+        self._keys_sorted = None
+        self._vals_sorted = None
+        def is_int(v: Any) -> bool:
+            return isinstance(v, (int, np.integer)) and not isinstance(v, (bool, np.bool_))
+        if mapping_dict and all(is_int(k) and is_int(v) for k, v in mapping_dict.items()):
+            try:
+                keys: np.ndarray = np.fromiter(mapping_dict.keys(), dtype=np.int64, count=len(mapping_dict))
+                vals: np.ndarray = np.fromiter(mapping_dict.values(), dtype=np.int64, count=len(mapping_dict))
+            except (OverflowError, TypeError):
+                pass  #ints outside int64 (e.g. 2**64) stay on the generic map path
+            else:
+                order: np.ndarray = np.argsort(keys)
+                self._keys_sorted = keys[order]
+                self._vals_sorted = vals[order]
+        self._derived_from = mapping_dict
 
     def fit(self, X: pd.DataFrame, y: Optional[Iterable] = None) -> Self:
         """
-        Fit method - performs no actual fitting operation.
+        Precompute a lookup table when the mapping column is categorical.
 
-        This method is implemented to adhere to the scikit-learn transformer interface
-        but doesn't perform any computation.
+        For a categorical column the mapping only has to be applied to the
+        categories, not to every row. The mapped value of each category is
+        stored in an array indexed by category code, so transform becomes a
+        single gather over the codes. Other columns need no fitting.
 
         Parameters
         ----------
@@ -101,11 +222,21 @@ class CustomMappingTransformer(BaseEstimator, TransformerMixin):
         self : instance of CustomMappingTransformer
             Returns self to allow method chaining.
         """
-        print(f"\nWarning: {self.__class__.__name__}.fit does nothing.\n")
+        assert isinstance(X, pd.core.frame.DataFrame), f'{self.__class__.__name__}.fit expected Dataframe but got {type(X)} instead.'
+        if __debug__ and self.mapping_column not in X.columns:
+            raise KeyError(f'{self.__class__.__name__}.fit unknown column "{self.mapping_column}"')
+        self._target_column_checked = True
+
+        self._derive_state()  #also drops the lookup table of a previous fit
+        column: pd.Series = X[self.mapping_column]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            categories: pd.Index = column.cat.categories
+            #unmapped categories keep their value; the trailing slot is picked up by code -1 (missing)
+            self._lut = np.array([self.mapping_dict.get(c, c) for c in categories] + [np.nan], dtype=object)
+            self._lut_categories = categories
         return self  #always the return value of fit
 
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
-        import warnings
         """
         Apply the mapping to the specified column in the input DataFrame.
 
@@ -117,37 +248,77 @@ class CustomMappingTransformer(BaseEstimator, TransformerMixin):
         Returns
         -------
         pandas.DataFrame
-            A copy of the input DataFrame with mapping applied to the specified column.
+            A new DataFrame with mapping applied to the specified column. Unchanged
+            columns share memory with X, so X should not be mutated in place afterwards.
+            X itself is returned if mapping_dict is empty, maps every key to itself,
+            or has no key among the column's values.
 
         Raises
         ------
         AssertionError
-            If X is not a pandas DataFrame or if mapping_column is not in X.
+            If X is not a pandas DataFrame.
+        KeyError
+            If mapping_column is not in X.
 
         Notes
         -----
-        This method provides warnings if:
+        When verbose is True, this method provides warnings if:
         1. Keys in mapping_dict are not found in the column values
         2. Values in the column don't have corresponding keys in mapping_dict
         """
-        assert isinstance(X, pd.core.frame.DataFrame), f'{self.__class__.__name__}.transform expected Dataframe but got {type(X)} instead.'
-        assert self.mapping_column in X.columns.to_list(), f'{self.__class__.__name__}.transform unknown column "{self.mapping_column}"'  #column legit?
-        warnings.filterwarnings('ignore', message='.*downcasting.*')  #squash warning in replace method below
-
-        #now check to see if all keys are contained in column
-        column_set: Set[Any] = set(X[self.mapping_column].unique())
-        keys_not_found: Set[Any] = set(self.mapping_dict.keys()) - column_set
-        if keys_not_found:
-            print(f"\nWarning: {self.__class__.__name__}[{self.mapping_column}] does not contain these keys as values {keys_not_found}\n")
-
-        #now check to see if some keys are absent
-        keys_absent: Set[Any] = column_set - set(self.mapping_dict.keys())
-        if keys_absent:
-            print(f"\nWarning: {self.__class__.__name__}[{self.mapping_column}] does not contain keys for these values {keys_absent}\n")
-
-        X_: pd.DataFrame = X.copy()
-        X_[self.mapping_column] = X_[self.mapping_column].replace(self.mapping_dict)
-        return X_
+        if __debug__ and not self._target_column_checked:  #already validated in fit otherwise
+            assert isinstance(X, pd.core.frame.DataFrame), f'{self.__class__.__name__}.transform expected Dataframe but got {type(X)} instead.'
+            if self.mapping_column not in X.columns:  #Index hash lookup, no list of column names
+                raise KeyError(f'{self.__class__.__name__}.transform unknown column "{self.mapping_column}"')
+        if self._derived_from is not self.mapping_dict:
+            self._derive_state()  #first transform, or mapping_dict was replaced via set_params
+
+        column: pd.Series = X[self.mapping_column]
+        if self.verbose:
+            #the full column scan is only paid for when someone wants to see the warnings
+            column_set: Set[Any] = set(column.unique())
+
+            #now check to see if all keys are contained in column
+            keys_not_found: Set[Any] = self._mapping_keys - column_set
+            if keys_not_found:
+                print(f"\nWarning: {self.__class__.__name__}[{self.mapping_column}] does not contain these keys as values {keys_not_found}\n")
+
+            #now check to see if some keys are absent
+            keys_absent: Set[Any] = column_set - self._mapping_keys
+            if keys_absent:
+                print(f"\nWarning: {self.__class__.__name__}[{self.mapping_column}] does not contain keys for these values {keys_absent}\n")
+
+        if self._is_empty or self._is_identity:
+            return X  #nothing would change, so skip the lookup and the new frame
+
+        if self._lut is not None and isinstance(column.dtype, pd.CategoricalDtype) and column.cat.categories.equals(self._lut_categories):
+            #same categories as in fit: gather the mapped values by category code, no hashing per row
+            mapped: pd.Series = pd.Series(self._lut.take(column.cat.codes.to_numpy()), index=X.index, name=self.mapping_column).infer_objects()
+        elif self._keys_sorted is not None and isinstance(column.dtype, np.dtype) and column.dtype.kind == 'i':
+            #integer column and integer mapping: binary search over the sorted keys, all in C
+            values: np.ndarray = column.to_numpy()
+            idx: np.ndarray = np.minimum(np.searchsorted(self._keys_sorted, values), len(self._keys_sorted) - 1)
+            found: np.ndarray = self._keys_sorted[idx] == values
+            mapped = pd.Series(np.where(found, self._vals_sorted[idx], values), index=X.index, name=self.mapping_column)
+            mapped = _as_source_dtype(mapped, column.dtype)  #the int64 lookup arrays would otherwise widen e.g. int32
+        else:
+            #one hash pass codes every row by its distinct value; the mapping is then applied to the distinct
+            #values only (values without a key keep their value, as replace did) and gathered back by code
+            codes, uniques = pd.factorize(column, use_na_sentinel=False)
+            if not any(v in self._mapping_keys for v in uniques):
+                return X  #no value has a key, so the column (and its dtype) stays as it is
+            lut: np.ndarray = np.array([self.mapping_dict.get(v, v) for v in uniques], dtype=object)
+            mapped = pd.Series(lut.take(codes), index=X.index, name=self.mapping_column)
+            #like replace: a numeric column keeps its dtype where the values allow it, and numbers put
+            #into a string or object column stay objects (0, 1 and NaN don't become 0.0, 1.0 and NaN)
+            inferred: pd.Series = mapped.infer_objects()
+            if pd.api.types.is_numeric_dtype(column.dtype):
+                mapped = _as_source_dtype(inferred, column.dtype)
+            elif not pd.api.types.is_numeric_dtype(inferred.dtype):
+                mapped = inferred
+
+        #assign shares the untouched columns with X instead of deep-copying the whole frame
+        return X.assign(**{self.mapping_column: mapped})
 
     def fit_transform(self, X: pd.DataFrame, y: Optional[Iterable] = None) -> pd.DataFrame:
         """
@@ -165,10 +336,10 @@ class CustomMappingTransformer(BaseEstimator, TransformerMixin):
         Returns
         -------
         pandas.DataFrame
-            A copy of the input DataFrame with mapping applied to the specified column.
+            A new DataFrame with mapping applied to the specified column, sharing the
+            unchanged columns with X (or X itself), as returned by transform.
         """
-        #self.fit(X,y)  #commented out to avoid warning message in fit
-        result: pd.DataFrame = self.transform(X)
+        result: pd.DataFrame = self.fit(X, y).transform(X)
         return result
       
 
@@ -176,9 +347,13 @@ class CustomOHETransformer(BaseEstimator, TransformerMixin):
     """
     A transformer that performs one-hot encoding on a specified target column.
 
-    This transformer uses pandas' get_dummies function to create one-hot encoded
-    columns from a categorical column. The resulting columns are prefixed with
-    the target column name.
+    The categories are learned in fit, so the encoded columns are the same for
+    every DataFrame passed to transform. Values not seen in fit (and missing
+    values) are encoded as a row of zeros, like scikit-learn's
+    OneHotEncoder(handle_unknown='ignore'). The resulting int8 columns are
+    prefixed with the target column name. Without a fit (e.g. a transformer
+    pickled before fit learned anything) the categories of the DataFrame being
+    transformed are used, as pd.get_dummies does.
 
     Parameters
     ----------
@@ -189,6 +364,9 @@ class CustomOHETransformer(BaseEstimator, TransformerMixin):
     ----------
     target_column : str
         The name of the column to be one-hot encoded.
+    categories_ : pandas.Index or None
+        The sorted categories seen in fit, one output column per category.
+        None until fit is called.
 
     Examples
     --------
@@ -200,6 +378,9 @@ class CustomOHETransformer(BaseEstimator, TransformerMixin):
     ['joined_Belfast', 'joined_Cherbourg', 'joined_Queenstown']
     """
 
+    _target_column_checked = False  # set per instance once fit has validated the input
+    categories_ = None  # set by fit; also covers instances pickled before fit learned categories
+
     def __init__(self, target_column: str) -> None:
         """
         Initialize the CustomOHETransformer.
@@ -213,10 +394,11 @@ class CustomOHETransformer(BaseEstimator, TransformerMixin):
 
     def fit(self, X: pd.DataFrame, y: Optional[Iterable] = None):
         """
-        Fit method - performs no actual fitting operation.
+        Learn the categories of the target column.
 
-        This method is implemented to adhere to the scikit-learn transformer interface
-        but doesn't perform any computation.
+        Categories are sorted and missing values are excluded, as in pd.get_dummies.
+        The resulting Index also serves as the value -> code hash table in transform,
+        so the unique/sort work is done only once.
 
         Parameters
         ----------
@@ -230,6 +412,11 @@ class CustomOHETransformer(BaseEstimator, TransformerMixin):
         self : instance of CustomOHETransformer
             Returns self to allow method chaining.
         """
+        if __debug__ and self.target_column not in X.columns:
+            raise KeyError(f"{self.__class__.__name__}.fit unknown column \"{self.target_column}\"")
+        self._target_column_checked = True
+
+        self.categories_ = pd.Categorical(X[self.target_column]).categories
         return self
 
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
@@ -248,29 +435,27 @@ class CustomOHETransformer(BaseEstimator, TransformerMixin):
 
         Raises
         ------
-        AssertionError
+        KeyError
             If the target column doesn't exist in X.
         """
-        # Verify that the target column exists in the DataFrame
-        assert self.target_column in X.columns, f"{self.__class__.__name__}.transform unknown column \"{self.target_column}\""
-
-        # Perform one-hot encoding using pd.get_dummies
-        dummies = pd.get_dummies(X[self.target_column], prefix=self.target_column)
+        # Verify that the target column exists in the DataFrame, unless fit already did
+        if __debug__ and not self._target_column_checked and self.target_column not in X.columns:
+            raise KeyError(f"{self.__class__.__name__}.transform unknown column \"{self.target_column}\"")
+        # Not fitted: encode with the categories of X itself, as pd.get_dummies does
+        categories = self.categories_ if self.categories_ is not None else pd.Categorical(X[self.target_column]).categories
 
-        # Convert boolean values to integers (0 and 1)
-        dummies = dummies.astype(int)
+        # Category code of each row (-1 for missing or unseen values), looked up in the
+        # hash table the fitted Index keeps, so nothing is rebuilt per call
+        codes = categories.get_indexer(X[self.target_column])
 
-        # Create a copy of the original DataFrame
-        X_transformed = X.copy()
+        # Fill the whole one-hot block with one vectorized write instead of adding columns one at a time
+        encoded = np.zeros((len(X), len(categories)), dtype=np.int8)
+        present = codes >= 0
+        encoded[np.flatnonzero(present), codes[present]] = 1
+        dummies = pd.DataFrame(encoded, index=X.index, columns=[f"{self.target_column}_{c}" for c in categories])
 
-        # Drop the original target column
-        X_transformed = X_transformed.drop(columns=[self.target_column])
-
-        # Add the one-hot encoded columns to the DataFrame
-        for col in dummies.columns:
-            X_transformed[col] = dummies[col]
-
-        return X_transformed
+        # Drop the original target column and append the encoded block in a single concat
+        return pd.concat([X.drop(columns=[self.target_column]), dummies], axis=1)
 
     def fit_transform(self, X: pd.DataFrame, y: Optional[Iterable] = None) -> pd.DataFrame:
         """
@@ -290,7 +475,7 @@ class CustomOHETransformer(BaseEstimator, TransformerMixin):
         pandas.DataFrame
             A DataFrame with the target column one-hot encoded.
         """
-        return self.transform(X)
+        return self.fit(X, y).transform(X)
 
 
 class CustomDropColumnsTransformer(BaseEstimator, TransformerMixin):
@@ -303,8 +488,8 @@ class CustomDropColumnsTransformer(BaseEstimator, TransformerMixin):
 
     Parameters
     ----------
-    column_list : List[str]
-        List of column names to either drop or keep, depending on the action parameter.
+    column_list : List[str] or Tuple[str, ...]
+        Column names to either drop or keep, depending on the action parameter.
     action : str, default='drop'
         The action to perform on the specified columns. Must be one of:
         - 'drop': Remove the specified columns from the DataFrame
@@ -335,14 +520,16 @@ class CustomDropColumnsTransformer(BaseEstimator, TransformerMixin):
     ['A', 'C']
     """
 
-    def __init__(self, column_list: List[str], action: Literal['drop', 'keep'] = 'drop') -> None:
+    _column_list_from = None  #the column_list object _column_list_idx was built from
+
+    def __init__(self, column_list: Union[List[str], Tuple[str, ...]], action: Literal['drop', 'keep'] = 'drop') -> None:
         """
         Initialize the CustomDropColumnsTransformer.
 
         Parameters
         ----------
-        column_list : List[str]
-            List of column names to either drop or keep.
+        column_list : List[str] or Tuple[str, ...]
+            Column names to either drop or keep.
         action : str, default='drop'
             The action to perform on the specified columns.
             Must be either 'drop' or 'keep'.
@@ -350,11 +537,11 @@ class CustomDropColumnsTransformer(BaseEstimator, TransformerMixin):
         Raises
         ------
         AssertionError
-            If action is not 'drop' or 'keep', or if column_list is not a list.
+            If action is not 'drop' or 'keep', or if column_list is not a list or tuple.
         """
         assert action in ['keep', 'drop'], f'DropColumnsTransformer action {action} not in ["keep", "drop"]'
-        assert isinstance(column_list, list), f'DropColumnsTransformer expected list but saw {type(column_list)}'
-        self.column_list: List[str] = column_list
+        assert isinstance(column_list, (list, tuple)), f'DropColumnsTransformer expected list or tuple but saw {type(column_list)}'
+        self.column_list: Union[List[str], Tuple[str, ...]] = column_list  #kept as passed so sklearn's get_params/clone round-trip
         self.action: Literal['drop', 'keep'] = action
 
     def fit(self, X: pd.DataFrame, y: Optional[Iterable] = None):
@@ -378,6 +565,13 @@ class CustomDropColumnsTransformer(BaseEstimator, TransformerMixin):
         """
         return self
 
+    def _column_index(self) -> pd.Index:
+        """Return column_list as a pd.Index, rebuilt only when column_list is replaced (e.g. by set_params)."""
+        if self._column_list_from is not self.column_list:
+            self._column_list_idx: pd.Index = pd.Index(tuple(self.column_list))  #hash-indexed, reused by every transform
+            self._column_list_from = self.column_list
+        return self._column_list_idx
+
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         """
         Transform the DataFrame by either dropping or keeping specified columns.
@@ -404,37 +598,36 @@ class CustomDropColumnsTransformer(BaseEstimator, TransformerMixin):
         # Ensure X is a DataFrame
         assert isinstance(X, pd.DataFrame), f"{self.__class__.__name__}.transform expected DataFrame but got {type(X)} instead."
 
-        # Create a copy of the DataFrame
-        X_transformed = X.copy()
+        column_list_idx: pd.Index = self._column_index()
 
-        # Get the set of columns in the DataFrame
-        df_columns = set(X.columns)
+        # Dropping nothing: hand back X without building a new frame
+        if self.action == 'drop' and len(column_list_idx) == 0:
+            return X
 
-        # Get the set of columns specified in column_list
-        specified_columns = set(self.column_list)
+        X_transformed = X
 
-        # Find columns that are in the column_list but not in the DataFrame
-        missing_columns = specified_columns - df_columns
+        # Split column_list into columns present in / missing from the DataFrame, using the
+        # hash lookups of pd.Index (present keeps the column_list order)
+        present_columns = column_list_idx.intersection(X.columns, sort=False)
+        missing_columns = column_list_idx.difference(X.columns, sort=False)
 
         if self.action == 'keep':
             # For 'keep' action, it's an error if specified columns are missing
-            if missing_columns:
+            if len(missing_columns):
                 missing_str = ", ".join([f"'{col}'" for col in missing_columns])
-                assert not missing_columns, f"Columns {{{missing_str}}}, are not in the data table"
+                assert False, f"Columns {{{missing_str}}}, are not in the data table"
 
-            # Keep only the specified columns
-            columns_to_keep = [col for col in self.column_list if col in df_columns]
-            X_transformed = X_transformed[columns_to_keep]
+            # Keep only the specified columns (selection returns a new DataFrame)
+            X_transformed = X.loc[:, present_columns]
 
         elif self.action == 'drop':
             # For 'drop' action, just issue a warning if specified columns are missing
-            if missing_columns:
+            if len(missing_columns):
                 missing_str = ", ".join([f"'{col}'" for col in missing_columns])
                 print(f"\nWarning: {self.__class__.__name__} does not contain these columns to drop: {missing_str}.\n")
 
             # Drop the specified columns that exist in the DataFrame
-            columns_to_drop = [col for col in self.column_list if col in df_columns]
-            X_transformed = X_transformed.drop(columns=columns_to_drop)
+            X_transformed = X.drop(columns=present_columns)
 
         return X_transformed
 
@@ -459,35 +652,52 @@ class CustomDropColumnsTransformer(BaseEstimator, TransformerMixin):
         return self.transform(X)
 
 
-class CustomSigma3Transformer(BaseEstimator, TransformerMixin):
+class _ColumnOp(BaseEstimator, TransformerMixin):
     """
-    A transformer that applies 3-sigma clipping to a specified column in a pandas DataFrame.
+    Base class for transformers that fit statistics on one numeric column and rewrite only that column.
 
-    This transformer follows the scikit-learn transformer interface and can be used in
-    a scikit-learn pipeline. It clips values in the target column to be within three standard
-    deviations from the mean.
+    Subclasses store the column name as ``target_column`` and implement:
 
-    Parameters
-    ----------
-    target_column : Hashable
-        The name of the column to apply 3-sigma clipping on.
+    - ``_fit_stats(arr)``: compute and store the statistics from the column's float64 values (NaN = missing).
+    - ``_is_fitted()``: whether ``_fit_stats`` has been run.
+    - ``_apply(arr)``: return the transformed values as a new array; arr must not be modified.
+    - ``_is_noop(arr)`` (optional): True if ``_apply`` would return arr unchanged, so transform
+      can return X itself.
+    - ``_is_identity()`` (optional): True if the fitted op leaves any column untouched, whatever
+      its dtype, so transform returns X itself without converting the column to float64.
 
-    Attributes
-    ----------
-    high_wall : Optional[float]
-        The upper bound for clipping, computed as mean + 3 * standard deviation.
-    low_wall : Optional[float]
-        The lower bound for clipping, computed as mean - 3 * standard deviation.
+    fit and transform work directly on the column's NumPy array and rebuild the DataFrame with a
+    single assign. ComposedColumnTransformer uses the same hooks to run several ops over one buffer.
+
+    Input validation happens in fit; transform only repeats the column check if fit was never
+    called. Under ``python -O`` the checks are skipped entirely.
     """
-    
-    def __init__(self, target_column):
-        self.target_column = target_column
-        self.high_wall = None
-        self.low_wall = None
-    
+
+    _target_column_checked = False  # set per instance once fit has validated the input
+
+    def _validate(self, X, numeric=True):
+        """Check that X is a DataFrame holding the target column (numeric if required)."""
+        if __debug__:
+            assert isinstance(X, pd.DataFrame), f'{self.__class__.__name__} expected DataFrame but got {type(X)} instead.'
+            if self.target_column not in X.columns:  # Index hash lookup, no list of column names
+                raise KeyError(f'{self.__class__.__name__} unknown column {self.target_column}')
+            if numeric:
+                assert pd.api.types.is_numeric_dtype(X[self.target_column]), f'expected numeric column but got {X[self.target_column].dtype}'
+            self._target_column_checked = True
+
+    def __sklearn_is_fitted__(self):
+        """Let sklearn's check_is_fitted (used by Pipeline) see the fitted statistics."""
+        return self._is_fitted()
+
+    def _is_noop(self, arr):
+        return False
+
+    def _is_identity(self):
+        return False
+
     def fit(self, X, y=None):
         """
-        Compute the 3-sigma boundaries for the target column.
+        Compute the statistics of the target column.
         
         Parameters
         ----------
@@ -500,23 +710,13 @@ class CustomSigma3Transformer(BaseEstimator, TransformerMixin):
         -------
         self : returns an instance of self.
         """
-        assert isinstance(X, pd.DataFrame), f'expected DataFrame but got {type(X)} instead.'
-        assert self.target_column in X.columns.to_list(), f'unknown column {self.target_column}'
-        assert pd.api.types.is_numeric_dtype(X[self.target_column]), f'expected numeric column but got {X[self.target_column].dtype}'
-        
-        # Compute mean and standard deviation
-        mean = X[self.target_column].mean()
-        std = X[self.target_column].std()
-        
-        # Compute boundaries
-        self.low_wall = mean - 3 * std
-        self.high_wall = mean + 3 * std
-        
+        self._validate(X)
+        self._fit_stats(X[self.target_column].to_numpy(dtype=np.float64, na_value=np.nan))
         return self
-    
+
     def transform(self, X):
         """
-        Apply 3-sigma clipping to the target column.
+        Apply the fitted operation to the target column.
         
         Parameters
         ----------
@@ -526,20 +726,23 @@ class CustomSigma3Transformer(BaseEstimator, TransformerMixin):
         Returns
         -------
         pandas.DataFrame
-            DataFrame with the target column clipped according to 3-sigma rule.
+            A new DataFrame with the target column replaced; the other columns are shared with X.
+            X itself is returned when the operation would leave a float64 column unchanged,
+            or leaves every column unchanged (e.g. robust scaling with an IQR of 0).
         """
-        assert self.high_wall is not None and self.low_wall is not None, "Sigma3Transformer.fit has not been called yet."
-        assert isinstance(X, pd.DataFrame), f'expected DataFrame but got {type(X)} instead.'
-        assert self.target_column in X.columns.to_list(), f'unknown column {self.target_column}'
-        
-        # Create a copy of the input DataFrame
-        X_transformed = X.copy()
-        
-        # Apply clipping
-        X_transformed[self.target_column] = X_transformed[self.target_column].clip(lower=self.low_wall, upper=self.high_wall)
-        
-        return X_transformed
-    
+        assert self._is_fitted(), f"{self.__class__.__name__}.fit has not been called yet."
+        if __debug__ and not self._target_column_checked:
+            self._validate(X, numeric=False)
+        if self._is_identity():
+            return X
+
+        values = X[self.target_column].to_numpy(dtype=np.float64, na_value=np.nan)
+        # Skip the new column and frame when nothing would change (float64 only, so the output dtype
+        # doesn't depend on whether a particular batch needed changes)
+        if X[self.target_column].dtype == np.float64 and self._is_noop(values):
+            return X
+        return X.assign(**{self.target_column: self._apply(values)})
+
     def fit_transform(self, X, y=None):
         """
         Fit the transformer and then transform the data.
@@ -554,12 +757,59 @@ class CustomSigma3Transformer(BaseEstimator, TransformerMixin):
         Returns
         -------
         pandas.DataFrame
-            DataFrame with the target column clipped according to 3-sigma rule.
+            A new DataFrame with the target column replaced.
         """
         return self.fit(X).transform(X)
 
 
-class CustomTukeyTransformer(BaseEstimator, TransformerMixin):
+class CustomSigma3Transformer(_ColumnOp):
+    """
+    A transformer that applies 3-sigma clipping to a specified column in a pandas DataFrame.
+
+    This transformer follows the scikit-learn transformer interface and can be used in
+    a scikit-learn pipeline. It clips values in the target column to be within three standard
+    deviations from the mean.
+
+    Parameters
+    ----------
+    target_column : Hashable
+        The name of the column to apply 3-sigma clipping on.
+
+    Attributes
+    ----------
+    high_wall : Optional[float]
+        The upper bound for clipping, computed as mean + 3 * standard deviation.
+    low_wall : Optional[float]
+        The lower bound for clipping, computed as mean - 3 * standard deviation.
+    """
+    
+    def __init__(self, target_column):
+        self.target_column = target_column
+        self.high_wall = None
+        self.low_wall = None
+    
+    def _fit_stats(self, arr):
+        # Both statistics straight from the float array (NaNs skipped, like pandas' reducers),
+        # bypassing two pandas reductions
+        values = arr[~np.isnan(arr)]
+        mean = values.mean()
+        std = values.std(ddof=1)  #same sample std as pandas' .std()
+        
+        # Compute boundaries
+        self.low_wall = float(mean - 3 * std)
+        self.high_wall = float(mean + 3 * std)
+
+    def _is_fitted(self):
+        return self.high_wall is not None and self.low_wall is not None
+
+    def _apply(self, arr):
+        return np.clip(arr, self.low_wall, self.high_wall)
+
+    def _is_noop(self, arr):
+        return _within(arr, self.low_wall, self.high_wall)
+
+
+class CustomTukeyTransformer(_ColumnOp):
     """
     A transformer that applies Tukey's fences (inner or outer) to a specified column in a pandas DataFrame.
     
@@ -601,29 +851,11 @@ class CustomTukeyTransformer(BaseEstimator, TransformerMixin):
         self.inner_high = None
         self.outer_high = None
     
-    def fit(self, X, y=None):
-        """
-        Compute Tukey's fences for the target column.
-        
-        Parameters
-        ----------
-        X : pandas.DataFrame
-            The input DataFrame containing the target column.
-        y : ignored
-            Not used, present for API consistency.
-            
-        Returns
-        -------
-        self : returns an instance of self.
-        """
-        assert isinstance(X, pd.DataFrame), f'expected DataFrame but got {type(X)} instead.'
-        assert self.target_column in X.columns.to_list(), f'unknown column {self.target_column}'
-        assert pd.api.types.is_numeric_dtype(X[self.target_column]), f'expected numeric column but got {X[self.target_column].dtype}'
+    def _fit_stats(self, arr):
         assert self.fence in ['inner', 'outer'], f'fence must be either "inner" or "outer", got {self.fence}'
         
         # Compute quartiles and IQR
-        q1 = X[self.target_column].quantile(0.25)
-        q3 = X[self.target_column].quantile(0.75)
+        q1, _, q3 = _q25_50_75(arr)
         iqr = q3 - q1
         
         # Compute inner and outer fences
@@ -631,57 +863,22 @@ class CustomTukeyTransformer(BaseEstimator, TransformerMixin):
         self.inner_high = q3 + 1.5 * iqr
         self.outer_low = q1 - 3.0 * iqr
         self.outer_high = q3 + 3.0 * iqr
-        
-        return self
-    
-    def transform(self, X):
-        """
-        Apply Tukey's fences to the target column.
-        
-        Parameters
-        ----------
-        X : pandas.DataFrame
-            The input DataFrame containing the target column.
-            
-        Returns
-        -------
-        pandas.DataFrame
-            DataFrame with the target column clipped according to Tukey's fences.
-        """
-        assert self.inner_low is not None and self.inner_high is not None, "TukeyTransformer.fit has not been called yet."
-        assert isinstance(X, pd.DataFrame), f'expected DataFrame but got {type(X)} instead.'
-        assert self.target_column in X.columns.to_list(), f'unknown column {self.target_column}'
-        
-        # Create a copy of the input DataFrame
-        X_transformed = X.copy()
-        
+
+    def _is_fitted(self):
+        return self.inner_low is not None and self.inner_high is not None
+
+    def _fences(self):
+        return (self.inner_low, self.inner_high) if self.fence == 'inner' else (self.outer_low, self.outer_high)
+
+    def _apply(self, arr):
         # Apply clipping based on fence type
-        if self.fence == 'inner':
-            X_transformed[self.target_column] = X_transformed[self.target_column].clip(lower=self.inner_low, upper=self.inner_high)
-        else:  # outer fence
-            X_transformed[self.target_column] = X_transformed[self.target_column].clip(lower=self.outer_low, upper=self.outer_high)
-        
-        return X_transformed
-    
-    def fit_transform(self, X, y=None):
-        """
-        Fit the transformer and then transform the data.
-        
-        Parameters
-        ----------
-        X : pandas.DataFrame
-            The input DataFrame containing the target column.
-        y : ignored
-            Not used, present for API consistency.
-            
-        Returns
-        -------
-        pandas.DataFrame
-            DataFrame with the target column clipped according to Tukey's fences.
-        """
-        return self.fit(X).transform(X)
+        return np.clip(arr, *self._fences())
+
+    def _is_noop(self, arr):
+        return _within(arr, *self._fences())
+
 
-class CustomRobustTransformer(BaseEstimator, TransformerMixin):
+class CustomRobustTransformer(_ColumnOp):
     """Applies robust scaling to a specified column in a pandas DataFrame.
     This transformer calculates the interquartile range (IQR) and median
     during the `fit` method and then uses these values to scale the
@@ -708,62 +905,142 @@ class CustomRobustTransformer(BaseEstimator, TransformerMixin):
         self.iqr = None
         self.med = None
     
+    def _fit_stats(self, arr):
+        # Calculate the 25th percentile, median and 75th percentile in one pass
+        q1, med, q3 = _q25_50_75(arr)
+        
+        # Calculate IQR
+        self.iqr = q3 - q1
+        
+        self.med = med
+
+    def _is_fitted(self):
+        return self.iqr is not None and self.med is not None
+
+    def _apply(self, arr):
+        # Apply the transformation only if IQR is not zero (to handle binary columns)
+        if self.iqr == 0:
+            return arr.copy()
+        return _robust_scale(arr, self.med, self.iqr)
+
+    def _is_noop(self, arr):
+        return self.iqr == 0
+
+    def _is_identity(self):
+        # A zero IQR (e.g. binary column) leaves the column as it is, int columns stay int
+        return self.iqr == 0
+
+
+class ComposedColumnTransformer(BaseEstimator, TransformerMixin):
+    """
+    Runs several single-column transformers over one shared NumPy buffer.
+
+    Stacking CustomSigma3Transformer, CustomTukeyTransformer and CustomRobustTransformer
+    steps in a Pipeline rebuilds the DataFrame once per step. This transformer extracts all
+    of their target columns with a single to_numpy call, fits and applies each op in order
+    on its column of that buffer, and rebuilds the DataFrame once at the end.
+
+    Parameters
+    ----------
+    ops : list of _ColumnOp
+        The column transformers to run, in order. As with Pipeline steps, an op sees the
+        output of the ops before it (e.g. scaling after Tukey clipping of the same column).
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> df = pd.DataFrame({'Age': [22.0, 38.0, 26.0, 35.0, 90.0]})
+    >>> composed = ComposedColumnTransformer([
+    ...     CustomTukeyTransformer('Age', 'outer'),
+    ...     CustomRobustTransformer('Age'),
+    ... ])
+    >>> transformed_df = composed.fit_transform(df)
+    >>> transformed_df['Age'].round(3).tolist()
+    [-1.083, 0.25, -0.75, 0.0, 3.25]
+    """
+
+    def __init__(self, ops):
+        assert all(isinstance(op, _ColumnOp) for op in ops), f'{self.__class__.__name__} expects Sigma3/Tukey/Robust transformers as ops'
+        self.ops = ops
+
+    def __sklearn_is_fitted__(self):
+        """Let sklearn's check_is_fitted (used by Pipeline) see whether every op is fitted."""
+        return all(op._is_fitted() for op in self.ops)
+
+    def _buffer(self, X):
+        """Return the distinct target columns and a writable float64 copy of them, one contiguous column each."""
+        assert isinstance(X, pd.DataFrame), f'{self.__class__.__name__} expected DataFrame but got {type(X)} instead.'
+        columns = list(dict.fromkeys(op.target_column for op in self.ops))
+        buffer = np.array(X[columns].to_numpy(dtype=np.float64, na_value=np.nan), order='F')
+        return columns, buffer
+
     def fit(self, X, y=None):
-        """Compute the IQR and median of the target column.
+        """
+        Fit every op in order; later ops are fitted on the output of earlier ones.
         
         Parameters
         ----------
         X : pandas.DataFrame
-            The input data to fit.
+            The input DataFrame containing the target columns.
         y : ignored
             Not used, present for API consistency.
             
         Returns
         -------
-        self : object
-            Returns self.
+        self : returns an instance of self.
         """
-        # Verify that the target column exists in the DataFrame
-        if self.target_column not in X.columns:
-            raise AssertionError(f"CustomRobustTransformer.fit unrecognizable column {self.target_column}.")
-        
-        # Calculate the 25th and 75th percentiles
-        q1 = X[self.target_column].quantile(0.25)
-        q3 = X[self.target_column].quantile(0.75)
-        
-        # Calculate IQR
-        self.iqr = q3 - q1
-        
-        # Calculate median
-        self.med = X[self.target_column].median()
-        
+        self.fit_transform(X)
         return self
-    
+
     def transform(self, X):
-        """Scale the target column using the IQR and median.
+        """
+        Apply every fitted op in order to its column.
         
         Parameters
         ----------
         X : pandas.DataFrame
-            The input data to transform.
+            The input DataFrame containing the target columns.
             
         Returns
         -------
-        X_transformed : pandas.DataFrame
-            The transformed DataFrame with the target column scaled.
+        pandas.DataFrame
+            A new DataFrame with the target columns replaced; the other columns are shared with X.
         """
-        # Check if the transformer is fitted
-        if self.iqr is None or self.med is None:
-            raise AssertionError("NotFittedError: This CustomRobustTransformer instance is not fitted yet.")
-        
-        # Make a copy of the input DataFrame to avoid modifying the original
-        X_transformed = X.copy()
-        
-        # Apply the transformation only if IQR is not zero (to handle binary columns)
-        if self.iqr != 0:
-            X_transformed[self.target_column] = (X[self.target_column] - self.med) / self.iqr
+        assert self.__sklearn_is_fitted__(), f"{self.__class__.__name__}.fit has not been called yet."
+        columns, buffer = self._buffer(X)
+        position = {col: j for j, col in enumerate(columns)}
+        for op in self.ops:
+            j = position[op.target_column]
+            if not op._is_noop(buffer[:, j]):
+                buffer[:, j] = op._apply(buffer[:, j])
+        return X.assign(**dict(zip(columns, buffer.T)))
+
+    def fit_transform(self, X, y=None):
+        """
+        Fit every op in order and return the transformed data.
         
-        return X_transformed
+        Parameters
+        ----------
+        X : pandas.DataFrame
+            The input DataFrame containing the target columns.
+        y : ignored
+            Not used, present for API consistency.
+            
+        Returns
+        -------
+        pandas.DataFrame
+            A new DataFrame with the target columns replaced.
+        """
+        for op in self.ops:
+            op._validate(X)
+        columns, buffer = self._buffer(X)
+        position = {col: j for j, col in enumerate(columns)}
+        for op in self.ops:
+            j = position[op.target_column]
+            op._fit_stats(buffer[:, j])
+            if not op._is_noop(buffer[:, j]):
+                buffer[:, j] = op._apply(buffer[:, j])
+        return X.assign(**dict(zip(columns, buffer.T)))
 
 class CustomKNNTransformer(BaseEstimator, TransformerMixin):
     """Imputes missing values using KNN.
@@ -774,8 +1051,9 @@ class CustomKNNTransformer(BaseEstimator, TransformerMixin):
 
     Parameters
     ----------
-    n_neighbors : int, default=5
-        Number of neighboring samples to use for imputation.
+    n_neighbors : int or None, default=None
+        Number of neighboring samples to use for imputation. If None, the
+        square root of the number of rows seen in fit is used.
     weights : {'uniform', 'distance'}, default='uniform'
         Weight function used in prediction. Possible values:
         "uniform" : uniform weights. All points in each neighborhood
@@ -783,16 +1061,54 @@ class CustomKNNTransformer(BaseEstimator, TransformerMixin):
         "distance" : weight points by the inverse of their distance.
         in this case, closer neighbors of a query point will have a
         greater influence than neighbors which are further away.
+    dtype : numpy dtype, default=np.float64
+        Floating point type the numeric columns are cast to before the
+        distance computations. np.float32 halves the memory traffic of the
+        pairwise nan-euclidean distances, but near-zero distances lose
+        precision and near-tied neighbors can be ranked differently.
+        Observed values are unaffected and the output stays float64, only
+        imputed values are computed at this precision.
+    n_jobs : int or None, default=-1
+        Number of threads imputing blocks of rows in parallel during
+        transform. -1 uses all cores.
+    chunk_size : int, default=1000
+        Number of query rows per block. Each block holds its distances to
+        all fit rows in memory at once.
+    memory : str, joblib.Memory or None, default=None
+        Used to cache fit_transform, like Pipeline's memory. Repeated
+        fit_transform calls on identical data (e.g. the same training split
+        seen again by find_random_state or dataset_setup) reuse the fitted
+        state and imputed frame instead of recomputing them. A string is
+        the cache directory. None disables caching.
+    return_numpy : bool, default=False
+        If True, transform and fit_transform return the imputed data as a
+        numpy array instead of a DataFrame. Meant for a terminal pipeline
+        step whose output is converted to an array anyway (see
+        dataset_setup), saving the DataFrame round-trip.
+
+    Attributes
+    ----------
+    n_neighbors_ : int
+        The number of neighbors actually used, set by fit.
     """
+
+    # Defaults of the later parameters, for instances pickled before they existed
+    dtype = np.float64
+    n_jobs = -1
+    chunk_size = 1000
+    memory = None
+    return_numpy = False
+    _ref = None  # reference rows, set by fit
     
-    def __init__(self, n_neighbors=5, weights='uniform'):
+    def __init__(self, n_neighbors=None, weights='uniform', dtype=np.float64, n_jobs=-1, chunk_size=1000, memory=None, return_numpy=False):
         self.n_neighbors = n_neighbors
         self.weights = weights
-        self.imputer = KNNImputer(
-            n_neighbors=n_neighbors,
-            weights=weights,
-            add_indicator=False  # Hard-coded to False as required
-        )
+        self.dtype = dtype
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        self.memory = memory
+        self.return_numpy = return_numpy
+        self.imputer = None  # KNNImputer is created in fit, once n_neighbors_ is known
         self.fitted = False  # Keep track of whether the transformer has been fitted
         
     def fit(self, X, y=None):
@@ -810,8 +1126,18 @@ class CustomKNNTransformer(BaseEstimator, TransformerMixin):
         self : object
             Returns self.
         """
+        # Rule of thumb k = sqrt(n) when no neighbor count is given
+        self.n_neighbors_ = self.n_neighbors if self.n_neighbors is not None else max(1, int(np.sqrt(len(X))))
+
         # Fit the KNNImputer
-        self.imputer.fit(X)
+        self.imputer = KNNImputer(
+            n_neighbors=self.n_neighbors_,
+            weights=self.weights,
+            add_indicator=False  # Hard-coded to False as required
+        )
+        self.imputer.fit(self._cast(X))
+        self._set_reference()
+
         self.fitted = True  # Mark as fitted
         self.columns_ = X.columns  # Store column names for transform
         return self
@@ -826,19 +1152,118 @@ class CustomKNNTransformer(BaseEstimator, TransformerMixin):
             
         Returns
         -------
-        pandas DataFrame
-            The imputed dataframe.
+        pandas DataFrame or numpy ndarray
+            The imputed dataframe, all columns float64 as with KNNImputer.
+            A float64 numpy array if return_numpy is True.
         """
         # Check if fitted
         if not self.fitted:
             raise ValueError("This CustomKNNTransformer instance is not fitted yet. "
                              "Call 'fit' before calling 'transform'.")
         
-        # Transform using the KNNImputer
-        imputed_array = self.imputer.transform(X)
+        if self._ref is None:
+            # Pickled before fit kept the reference rows: take them (and the neighbor count) from the fitted imputer
+            self.n_neighbors_ = self.imputer.n_neighbors
+            self._set_reference()
+
+        # Nothing to impute (common for later folds): skip the distance computation entirely
+        missing_mask = X.isna()
+        if not missing_mask.to_numpy().any():
+            return X.to_numpy(dtype=np.float64) if self.return_numpy else self._as_float64(X)
+        
+        # Impute blocks of query rows in parallel, each computing its distances to the fit rows
+        imputed_array = self._impute(self._cast(X).to_numpy(dtype=self.dtype, copy=True))
+
+        if self.return_numpy:
+            # Write the imputed cells straight into one array copy of X, no intermediate DataFrames
+            holes = missing_mask.to_numpy()
+            X_np = X.to_numpy(dtype=np.float64, copy=True)
+            X_np[holes] = imputed_array[holes]
+            return X_np
+
+        imputed = pd.DataFrame(imputed_array, index=X.index, columns=X.columns)
         
-        # Return as pandas DataFrame with original column names
-        return pd.DataFrame(imputed_array, index=X.index, columns=X.columns)
+        # Only fill the holes: observed values are kept exactly, even when dtype computed the imputations in float32.
+        # Like KNNImputer's output, every column comes back float64.
+        X_ = self._as_float64(X)
+        missing_columns = X.columns[missing_mask.any().to_numpy()]
+        return X_.assign(**{col: X_[col].fillna(imputed[col].astype(np.float64)) for col in missing_columns})
+    
+    def _set_reference(self):
+        """Keep the imputer's fit rows, their missing mask and column means for _impute."""
+        # Keep the reference rows plus their missing mask, so later imputation doesn't have to re-extract them
+        # from the imputer. The imputer's own array (and memory layout) is kept: BLAS rounds the distances
+        # differently for another layout, which reorders exactly tied neighbors relative to KNNImputer.
+        self._ref = self.imputer._fit_X.astype(self.dtype, copy=False)
+        self._ref_mask = np.isnan(self._ref)
+
+        # Column means of the fit rows, the fallback for rows with no comparable neighbor (computed as KNNImputer does)
+        self._ref_means = np.array([np.ma.array(self._ref[:, col], mask=self._ref_mask[:, col]).mean()
+                                    for col in range(self._ref.shape[1])], dtype=np.float64)
+
+    def _impute(self, X_np):
+        """Fill the NaNs of X_np in place from the nearest fit rows, as KNNImputer does."""
+        from joblib import Parallel, delayed
+
+        mask = np.isnan(X_np)
+        rows = np.flatnonzero(mask.any(axis=1))  #only rows with a hole need distances
+        # Blocks of chunk_size rows are imputed on worker threads; each writes only its own rows
+        blocks = [rows[start:start + self.chunk_size] for start in range(0, len(rows), self.chunk_size)]
+        Parallel(n_jobs=self.n_jobs, prefer='threads')(
+            delayed(self._impute_block)(X_np, mask, block) for block in blocks
+        )
+        return X_np
+
+    def _impute_block(self, X_np, mask, block):
+        """Impute the rows of X_np listed in block, computing their distances to all fit rows at once."""
+        from sklearn.metrics.pairwise import nan_euclidean_distances
+
+        dist_block = nan_euclidean_distances(X_np[block], self._ref)
+        for col in np.flatnonzero(mask[block].any(axis=0)):
+            donors = np.flatnonzero(~self._ref_mask[:, col])
+            if donors.size == 0:
+                continue  #column was never observed in fit, nothing to impute from
+            receivers = np.flatnonzero(mask[block, col])
+            dist = dist_block[np.ix_(receivers, donors)]
+            X_np[block[receivers], col] = self._neighbor_values(dist, self._ref[donors, col], self._ref_means[col])
+
+    def _neighbor_values(self, dist, donor_values, fallback):
+        """Weighted mean of the donor values over the n_neighbors_ nearest donors of each receiver."""
+        values = np.full(len(dist), fallback, dtype=dist.dtype)
+        comparable = ~np.isnan(dist).all(axis=1)  #receivers sharing no feature with any donor keep the mean
+        if not comparable.any():
+            return values
+        dist = dist[comparable]
+
+        # argpartition is linear per row and sorts NaN distances last
+        k = min(self.n_neighbors_, dist.shape[1])
+        nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        nearest_dist = np.take_along_axis(dist, nearest, axis=1)
+
+        if self.weights == 'uniform':
+            weights = np.ones_like(nearest_dist)
+        elif self.weights == 'distance':
+            with np.errstate(divide='ignore'):
+                weights = 1.0 / nearest_dist
+            # An exact match takes all the weight, as in sklearn's _get_weights
+            exact = np.isinf(weights)
+            exact_rows = exact.any(axis=1)
+            weights[exact_rows] = exact[exact_rows]
+        else:
+            weights = np.asarray(self.weights(nearest_dist), dtype=dist.dtype)
+        weights[np.isnan(nearest_dist)] = 0  #non-comparable donors don't count
+
+        values[comparable] = (weights * donor_values[nearest]).sum(axis=1) / weights.sum(axis=1)
+        return values
+
+    def _as_float64(self, X):
+        """Return X with every column that isn't float64 already converted to float64."""
+        return X.astype({col: np.float64 for col in X.columns if X[col].dtype != np.float64})
+
+    def _cast(self, X):
+        """Return X with its numeric columns cast to self.dtype for the imputer."""
+        numeric_columns = X.select_dtypes('number').columns
+        return X.astype({col: self.dtype for col in numeric_columns if X[col].dtype != self.dtype})
     
     def fit_transform(self, X, y=None):
         """Fit to data, then transform it.
@@ -852,10 +1277,24 @@ class CustomKNNTransformer(BaseEstimator, TransformerMixin):
             
         Returns
         -------
-        pandas DataFrame
-            The imputed dataframe.
+        pandas DataFrame or numpy ndarray
+            The imputed dataframe, a numpy array if return_numpy is True.
         """
-        return self.fit(X).transform(X)
+        if self.memory is None:
+            return self.fit(X).transform(X)
+
+        # Cached on an unfitted clone plus X, so the key is the parameters and the data; adopt the fitted state
+        from sklearn.base import clone
+        from sklearn.utils.validation import check_memory
+        fitted, imputed = check_memory(self.memory).cache(_knn_fit_transform)(clone(self), X)
+        self.__dict__.update(fitted.__dict__)
+        return imputed
+
+
+def _knn_fit_transform(transformer, X):
+    """Fit transformer on X and impute X. Module level so joblib.Memory can cache it."""
+    transformer.fit(X)
+    return transformer, transformer.transform(X)
 
 
 class CustomTargetTransformer(BaseEstimator, TransformerMixin):
@@ -869,6 +1308,9 @@ class CustomTargetTransformer(BaseEstimator, TransformerMixin):
         Smoothing factor. Higher values give more weight to the global mean.
     """
 
+    _small_batch_threshold = 256  #transform uses a plain dict lookup at or below this many rows
+    _lut = None  #built by fit; None on instances pickled before the lookup tables existed
+
     def __init__(self, col: str, smoothing: float =10.0):
         self.col = col
         self.smoothing = smoothing
@@ -891,28 +1333,35 @@ class CustomTargetTransformer(BaseEstimator, TransformerMixin):
         assert isinstance(y, Iterable), f'{self.__class__.__name__}.fit expected Iterable but got {type(y)} instead.'
         assert len(X) == len(y), f'{self.__class__.__name__}.fit X and y must be same length but got {len(X)} and {len(y)} instead.'
 
-        #Create new df with just col and target - enables use of pandas methods below
-        X_ = X[[self.col]]
-        target = self.col+'_target_'
-        X_[target] = y
-
-        # Calculate global mean
-        self.global_mean_ = X_[target].mean()
-
-        # Get counts and means
-        counts = X_[self.col].value_counts().to_dict()    #dictionary of unique values in the column col and their counts
-        means = X_[target].groupby(X_[self.col]).mean().to_dict() #dictionary of unique values in the column col and their means
-
-        # Calculate smoothed means
-        smoothed_means = {}
-        for category in counts.keys():
-            n = counts[category]
-            category_mean = means[category]
-            # Apply smoothing formula: (n * cat_mean + m * global_mean) / (n + m)
-            smoothed_mean = (n * category_mean + self.smoothing * self.global_mean_) / (n + self.smoothing)
-            smoothed_means[category] = smoothed_mean
-
-        self.encoding_dict_ = smoothed_means
+        #Encode the column once as integer codes (-1 for missing) so grouping is a bincount, not string hashing.
+        #A categorical column already carries its codes; anything else is factorized in order of appearance (no sort).
+        column = X[self.col]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            cats = column.cat.categories
+        else:
+            codes, cats = pd.factorize(column, sort=False)
+        y_ = np.asarray(y, dtype=np.float64)  #y is matched to X by position
+
+        # Calculate global mean, skipping missing targets as pandas' mean does
+        known = ~np.isnan(y_)
+        self.global_mean_ = float(y_[known].mean()) if known.any() else np.nan
+
+        # Get counts (all rows) and means (rows with a known target), one entry per category
+        observed = codes >= 0
+        counts = np.bincount(codes[observed], minlength=len(cats))
+        scored = observed & known
+        sums = np.bincount(codes[scored], weights=y_[scored], minlength=len(cats))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / np.bincount(codes[scored], minlength=len(cats))
+
+        # Apply smoothing formula: (n * cat_mean + m * global_mean) / (n + m), vectorized over categories.
+        # An unused category of a categorical column (n = 0, mean 0/0) gets the global mean, not 0 * NaN.
+        self._cats = cats
+        self._smoothed = (np.where(counts > 0, counts * means, 0.0) + self.smoothing * self.global_mean_) / (counts + self.smoothing)
+        self.encoding_dict_ = pd.Series(self._smoothed, index=cats)
+        self._lut = np.append(self._smoothed, np.nan)  #gather table indexed by category code; code -1 lands on the trailing NaN
+        self._lookup_dict = dict(self.encoding_dict_)  #plain dict for the small batch path in transform
 
         return self
 
@@ -928,15 +1377,34 @@ class CustomTargetTransformer(BaseEstimator, TransformerMixin):
         """
 
         assert isinstance(X, pd.core.frame.DataFrame), f'{self.__class__.__name__}.transform expected Dataframe but got {type(X)} instead.'
-        assert self.encoding_dict_, f'{self.__class__.__name__}.transform not fitted'
-
-        X_ = X.copy()
-
-        # Map categories to smoothed means, naturally producing np.nan for unseen categories, i.e.,
-        # when map tries to look up a value in the dictionary and doesn't find the key, it automatically returns np.nan. That is what we want.
-        X_[self.col] = X_[self.col].map(self.encoding_dict_)
-
-        return X_
+        assert self.encoding_dict_ is not None, f'{self.__class__.__name__}.transform not fitted'
+        if self._lut is None:
+            self._build_lookups()  #pickled before fit kept the lookup tables; rebuild them from encoding_dict_
+
+        column = X[self.col]
+        if isinstance(column.dtype, pd.CategoricalDtype) and column.cat.categories.equals(self._cats):
+            # Same categories, in the same order, as in fit: the codes already index the table, no hashing at all
+            encoded = self._lut.take(column.cat.codes.to_numpy())
+        elif len(X) <= self._small_batch_threshold:
+            # Tiny batches (e.g. single-row inference): a dict lookup per value beats the fixed cost of an index probe
+            values = column.to_numpy()
+            encoded = np.fromiter((self._lookup_dict.get(v, np.nan) for v in values), dtype=np.float64, count=len(values))
+        else:
+            # Look every value up in the fitted categories with one get_indexer probe (the Index keeps its
+            # hash table between calls) and gather the smoothed means.
+            # Unseen categories (and missing values) get position -1, which becomes np.nan. That is what we want.
+            encoded = self._lut.take(self._cats.get_indexer(column))
+
+        # assign shares the untouched columns with X instead of copying the whole frame
+        return X.assign(**{self.col: encoded})
+
+    def _build_lookups(self):
+        """Rebuild the lookup tables transform uses from encoding_dict_ (a dict or a Series)."""
+        encoding = pd.Series(self.encoding_dict_, dtype=np.float64)
+        self._cats = encoding.index
+        self._smoothed = encoding.to_numpy()
+        self._lut = np.append(self._smoothed, np.nan)
+        self._lookup_dict = dict(encoding)
 
     def fit_transform(self, X, y):
         """
@@ -951,11 +1419,100 @@ class CustomTargetTransformer(BaseEstimator, TransformerMixin):
         """
         return self.fit(X, y).transform(X)
 
+def split_pipeline(transformer: TransformerMixin) -> Tuple[Optional[Pipeline], TransformerMixin]:
+    """
+    Splits a pipeline into its leading row-by-row steps and the rest.
+
+    The leading CustomMappingTransformer / CustomDropColumnsTransformer steps (and passthrough steps)
+    turn each row into the same output no matter which other rows they were fit on, so they can be run
+    once on a whole dataset before it is split. Every step from the first data-dependent one on (target
+    encoding, Tukey fences, scaling, imputation) stays in the second part and must still be fit per split,
+    or statistics of the test rows would leak into it.
+
+    Parameters
+    ----------
+    transformer : TransformerMixin
+        A Pipeline, or any transformer (which is then returned whole as the second part).
+
+    Returns
+    -------
+    pre : Pipeline or None
+        Unfitted clone of the row-by-row head, or None if there is none.
+    post : TransformerMixin
+        Unfitted clone of the remaining steps (always at least the last step).
+    """
+    from sklearn.base import clone
+
+    if not isinstance(transformer, Pipeline):
+        return None, transformer
+
+    transformer = clone(transformer)
+    n_pre = 0
+    for _, step in transformer.steps[:-1]:
+        if not (step in ('passthrough', None) or isinstance(step, (CustomMappingTransformer, CustomDropColumnsTransformer))):
+            break
+        n_pre += 1
+    if n_pre == 0:
+        return None, transformer
+    return transformer[:n_pre], transformer[n_pre:]
+
+
+def _random_state_trial(
+    features_df: pd.DataFrame,
+    labels: np.ndarray,
+    transformer: TransformerMixin,
+    i: int,
+    knn_n_jobs: Optional[int] = None
+                  ) -> Optional[float]:
+    """
+    Runs one find_random_state iteration: split with random_state=i, transform, 5-NN vote.
+
+    `labels` must already be an array. The split is the one train_test_split gives for
+    random_state=i, so the chosen random state can be passed straight to dataset_setup.
+    `knn_n_jobs` is passed to the neighbor search.
+
+    Returns the test/train F1-score ratio, or None if the train F1-score is below 0.1.
+    """
+    from sklearn.base import clone
+    from sklearn.neighbors import NearestNeighbors
+    from scipy.stats import mode
+
+    # Fresh copy so trials running side by side never share fitted state
+    transformer = clone(transformer)
+
+    # Split row positions only, then slice features and labels once each
+    train_idx, test_idx = train_test_split(
+        np.arange(len(labels)), test_size=0.2, shuffle=True,
+        random_state=i, stratify=labels
+    )
+    train_X, test_X = features_df.iloc[train_idx], features_df.iloc[test_idx]
+    train_y, test_y = labels[train_idx], labels[test_idx]
+
+    # Apply transformation pipeline
+    transform_train_X = transformer.fit_transform(train_X, train_y)
+    transform_test_X = transformer.transform(test_X)
+
+    # Predict like KNeighborsClassifier(n_neighbors=5): majority label of the 5 nearest training rows,
+    # ties going to the smaller label. One index serves both neighbor queries.
+    index = NearestNeighbors(n_neighbors=5, n_jobs=knn_n_jobs).fit(transform_train_X)
+    train_pred = mode(train_y[index.kneighbors(transform_train_X, return_distance=False)], axis=1, keepdims=False).mode
+    test_pred = mode(train_y[index.kneighbors(transform_test_X, return_distance=False)], axis=1, keepdims=False).mode
+
+    train_f1 = _binary_scores(train_y, train_pred)[2]
+
+    if train_f1 < 0.1:
+        return None  # Skip if train_f1 is too low
+
+    test_f1 = _binary_scores(test_y, test_pred)[2]
+    return test_f1 / train_f1  # Ratio of test to train F1-score
+
+
 def find_random_state(
     features_df: pd.DataFrame,
     labels: Iterable,
     transformer: TransformerMixin,
-    n: int = 200
+    n: int = 200,
+    n_jobs: int = -1
                   ) -> Tuple[int, List[float]]:
     """
     Finds an optimal random state for train-test splitting based on F1-score stability.
@@ -975,52 +1532,43 @@ def find_random_state(
         A scikit-learn compatible transformer for preprocessing.
     n : int, default=200
         The number of random states to evaluate.
+    n_jobs : int, default=-1
+        Number of worker processes the random states are spread over. -1 uses all cores,
+        1 runs them one after another in this process.
 
     Returns
     -------
     rs_value : int
         The optimal random state where the F1-score ratio is closest to the mean.
     Var : List[float]
-        A list containing the F1-score ratios for each evaluated random state.
+        A list containing the F1-score ratios for each evaluated random state, skipped states left out.
 
     Notes
     -----
     - If the train F1-score is below 0.1, that iteration is skipped.
     - A higher F1-score ratio (closer to 1) indicates better train-test consistency.
+    - Each iteration works on its own clone of `transformer`, so `transformer` itself is left unfitted.
     """
+    from joblib import Parallel, delayed
+
+    # Row-by-row leading steps give the same rows whatever the split, so run them once up front
+    pre, transformer = split_pipeline(transformer)
+    if pre is not None:
+        features_df = pre.fit_transform(features_df, labels)
+
+    # The iterations are independent, so run them in parallel; results come back in random state order
+    labels = np.asarray(labels)  # Works with both lists and pd.Series
+    knn_n_jobs = -1 if n_jobs in (1, None) else None  # Let the neighbor search use the cores only when the trials run sequentially
+    results = Parallel(n_jobs=n_jobs, prefer='processes')(
+        delayed(_random_state_trial)(features_df, labels, transformer, i, knn_n_jobs) for i in range(n)
+    )
+    # test_f1/train_f1 ratio per random state, NaN where the iteration was skipped
+    var = np.fromiter((np.nan if f1_ratio is None else f1_ratio for f1_ratio in results), dtype=np.float64, count=n)
 
-    model = KNeighborsClassifier(n_neighbors=5)
-    Var: List[float] = []  # Collect test_f1/train_f1 ratios
-
-    for i in range(n):
-        train_X, test_X, train_y, test_y = train_test_split(
-            features_df, labels, test_size=0.2, shuffle=True,
-            random_state=i, stratify=labels  # Works with both lists and pd.Series
-        )
-
-        # Apply transformation pipeline
-        transform_train_X = transformer.fit_transform(train_X, train_y)
-        transform_test_X = transformer.transform(test_X)
-
-        # Train model and make predictions
-        model.fit(transform_train_X, train_y)
-        train_pred = model.predict(transform_train_X)
-        test_pred = model.predict(transform_test_X)
-
-        train_f1 = f1_score(train_y, train_pred)
-
-        if train_f1 < 0.1:
-            continue  # Skip if train_f1 is too low
-
-        test_f1 = f1_score(test_y, test_pred)
-        f1_ratio = test_f1 / train_f1  # Ratio of test to train F1-score
-
-        Var.append(f1_ratio)
-
-    mean_f1_ratio: float = np.mean(Var)
-    rs_value: int = np.abs(np.array(Var) - mean_f1_ratio).argmin()  # Index of value closest to mean
+    mean_f1_ratio: float = np.nanmean(var)
+    rs_value: int = int(np.nanargmin(np.abs(var - mean_f1_ratio)))  # Random state whose ratio is closest to the mean
 
-    return rs_value, Var
+    return rs_value, var[~np.isnan(var)].tolist()
 
 
 titanic_variance_based_split = 107   #add to your library
@@ -1099,29 +1647,74 @@ def customer_setup(customer_table, transformer=customer_transformer, rs=customer
     """
     return dataset_setup(customer_table, 'Rating', transformer, rs, ts)
 
-def threshold_results(thresh_list, actuals, predicted):
-  # Ensure 'auc' is a column in the DataFrame from the start
-  result_df = pd.DataFrame(columns=['threshold', 'precision', 'recall', 'f1', 'auc', 'accuracy'])
-  
-  for t in thresh_list:
-    yhat = [1 if v >=t else 0 for v in predicted] # Convert probabilities to 0/1 based on threshold
-    
-    precision = precision_score(actuals, yhat, zero_division=0)
-    recall = recall_score(actuals, yhat, zero_division=0)
-    f1 = f1_score(actuals, yhat, zero_division=0) # Added zero_division for consistency, though f1 by default is 0 if P and R are 0.
-    accuracy = accuracy_score(actuals, yhat)
-    
-    # Calculate AUC score using actuals and the original predicted probabilities (not yhat)
-    # This is why AUC remains constant across different thresholds in the output table.
-    auc = roc_auc_score(actuals, predicted) 
-    
-    result_df.loc[len(result_df)] = {'threshold':t, 
-                                     'precision':precision, 
-                                     'recall':recall, 
-                                     'f1':f1, 
-                                     'auc': auc, # Add the calculated AUC to the row
-                                     'accuracy':accuracy}
+def _scores_from_counts(tp, fp, fn, tn):
+  """
+  Precision, recall, F1 and accuracy from confusion matrix counts (scalars or arrays).
+
+  A ratio whose denominator is 0 is reported as 0, like sklearn's zero_division=0.
+  """
+  tp, fp, fn, tn = (np.asarray(count, dtype=np.float64) for count in (tp, fp, fn, tn))
+
+  def ratio(num, den):
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+  precision = ratio(tp, tp + fp)
+  recall = ratio(tp, tp + fn)
+  f1 = ratio(2 * tp, 2 * tp + fp + fn)
+  accuracy = ratio(tp + tn, tp + fp + fn + tn)
+  return precision, recall, f1, accuracy
+
+def _binary_scores(actuals, yhat):
+  """
+  Precision, recall, F1 and accuracy of 0/1 predictions yhat against 0/1 actuals.
+
+  Same values as the sklearn scorers with zero_division=0, from a single bincount of the
+  confusion cells and without their per-call input validation. Labels other than 0/1
+  (e.g. {1, 2} or {-1, 1}) are passed to the sklearn scorers instead, which score them with
+  pos_label=1 or raise their usual error.
+
+  >>> _binary_scores([0, 1, 1, 0], [0, 1, 0, 0])
+  (1.0, 0.5, 0.6666666666666666, 0.75)
+  >>> _binary_scores([1, 2, 2, 1], [1, 2, 1, 1])
+  (0.6666666666666666, 1.0, 0.8, 0.75)
+  """
+  actuals = np.asarray(actuals)
+  yhat = np.asarray(yhat)
+  if not (np.isin(actuals, (0, 1)).all() and np.isin(yhat, (0, 1)).all()):
+    # Other labels: the bincount cells below would be wrong, so let sklearn score (or reject) them
+    return (float(precision_score(actuals, yhat, zero_division=0)), float(recall_score(actuals, yhat, zero_division=0)),
+            float(f1_score(actuals, yhat, zero_division=0)), float(accuracy_score(actuals, yhat)))
+  cells = 2 * actuals.astype(np.int8) + yhat.astype(np.int8)
+  tn, fp, fn, tp = np.bincount(cells, minlength=4)
+  return tuple(float(score) for score in _scores_from_counts(tp, fp, fn, tn))
 
+def threshold_results(thresh_list, actuals, predicted):
+  # Calculate AUC score using actuals and the original predicted probabilities (not yhat)
+  # This is why AUC remains constant across different thresholds in the output table, so compute it once.
+  auc = roc_auc_score(actuals, predicted)
+
+  # yhat is 1 where predicted >= t. Sorting the scores of each class once turns the number of
+  # positives/negatives predicted 1 at every threshold into a binary search, instead of a pass over predicted per threshold.
+  actuals = np.asarray(actuals) == 1
+  predicted = np.asarray(predicted, dtype=np.float64)
+  thresholds = np.asarray(thresh_list, dtype=np.float64)
+  pos_scores = np.sort(predicted[actuals])
+  neg_scores = np.sort(predicted[~actuals])
+  tp = len(pos_scores) - np.searchsorted(pos_scores, thresholds, side='left')
+  fp = len(neg_scores) - np.searchsorted(neg_scores, thresholds, side='left')
+  fn = len(pos_scores) - tp
+  tn = len(neg_scores) - fp
+
+  precision, recall, f1, accuracy = _scores_from_counts(tp, fp, fn, tn)
+
+  # Build the DataFrame once from the metric columns; 'auc' is a column even when thresh_list is empty
+  result_df = pd.DataFrame({'threshold': list(thresh_list),
+                            'precision': precision,
+                            'recall': recall,
+                            'f1': f1,
+                            'auc': np.full(len(thresholds), auc), # Same AUC on every row
+                            'accuracy': accuracy},
+                           columns=['threshold', 'precision', 'recall', 'f1', 'auc', 'accuracy'])
   result_df = result_df.round(2) # Round all numerical values to 2 decimal places
 
   # Styling for the output (as in the notebook)
@@ -1142,6 +1735,30 @@ def threshold_results(thresh_list, actuals, predicted):
 
   return (result_df, fancy_df)
 
+def _search_n_jobs(model):
+    """
+    Returns the n_jobs for a search over model: all cores, divided by the threads model itself uses.
+
+    Models with an n_jobs parameter (KNN, random forests, LightGBM, XGBoost, ...) run that many threads
+    per fit; LightGBM and XGBoost also use every core when it is None. Capping the search workers keeps
+    workers times model threads at the core count instead of oversubscribing it. OpenMP-only models such
+    as HistGradientBoosting need no cap here: joblib already limits the threads of its worker processes.
+    """
+    import os
+    cpu_count = os.cpu_count() or 1
+    params = model.get_params()
+    if 'n_jobs' not in params:
+        return -1
+
+    model_jobs = params['n_jobs']
+    if model_jobs is None:
+        model_threads = cpu_count if model.__class__.__name__.startswith(('LGBM', 'XGB')) else 1
+    elif model_jobs < 0:
+        model_threads = max(1, cpu_count + 1 + model_jobs)  #joblib convention: -1 is all cores
+    else:
+        model_threads = model_jobs
+    return -1 if model_threads == 1 else max(1, cpu_count // model_threads)
+
 def halving_search(model, grid, x_train, y_train, factor=2, min_resources="exhaust", scoring='roc_auc'):
     """
     Performs HalvingGridSearchCV for a given model and parameter grid,
@@ -1160,14 +1777,13 @@ def halving_search(model, grid, x_train, y_train, factor=2, min_resources="exhau
     Returns:
     - The fitted HalvingGridSearchCV object (grid_result).
     """
-    
     # print(f"Starting HalvingGridSearchCV for {model.__class__.__name__}...") # Optional
     # start_time = time.time() # Optional
 
     # Set other HalvingGridSearchCV parameters based on typical notebook usage
     cv_val = 5
     random_state_val = 1234 # From the KNN example's HalvingGridSearchCV call
-    n_jobs_val = -1
+    n_jobs_val = _search_n_jobs(model) # All cores, fewer when the model is multi-threaded itself
     refit_val = True
     verbose_val = 0 # Since %%capture is often used, keep internal verbose low unless debugging
 
@@ -1193,12 +1809,18 @@ def halving_search(model, grid, x_train, y_train, factor=2, min_resources="exhau
     
     return grid_result
 
+def _sort_none_last(values):
+  #plain sort of the non-None values, then any Nones at the end: no key function called per comparison
+  values = list(values)
+  nones = [x for x in values if x is None]
+  return sorted(x for x in values if x is not None) + nones
+
 def sort_grid(grid):
   sorted_grid = grid.copy()
 
   #sort values - note that this will expand range for you
   for k,v in sorted_grid.items():
-    sorted_grid[k] = sorted(sorted_grid[k], key=lambda x: (x is None, x))  #handles cases where None is an alternative value
+    sorted_grid[k] = _sort_none_last(v)  #handles cases where None is an alternative value
 
   #sort keys
   sorted_grid = dict(sorted(sorted_grid.items()))
@@ -1208,13 +1830,35 @@ def sort_grid(grid):
 
 
 
+_setup_cache = {}  #dataset_setup results, keyed by the identity of its arguments
+
+def clear_setup_cache():
+  """Empties the dataset_setup cache, e.g. after changing a table or transformer in place."""
+  _setup_cache.clear()
+
 def dataset_setup(original_table, label_column_name:str, the_transformer, rs, ts=.2):
+  """
+  Splits original_table, fits the_transformer on the training part and transforms both parts.
+
+  Returns x_train, x_test, y_train, y_test as numpy arrays. Results are memoized on
+  (id(original_table), label_column_name, id(the_transformer), rs, ts), so repeating a call
+  (e.g. re-running a notebook cell) returns the earlier arrays without refitting.
+
+  The key is object identity, not content: after modifying original_table or the_transformer
+  in place, call clear_setup_cache() or the stale result is returned. A cache hit also leaves
+  the_transformer fitted on whatever split it was last fit on, and hands back the same arrays
+  as before, so copy them before changing them. The cache keeps the tables and transformers
+  it has seen alive until it is cleared.
+  """
+  key = (id(original_table), label_column_name, id(the_transformer), rs, ts)
+  if key in _setup_cache:
+    return _setup_cache[key][2]
+
   # Split data into features (X) and label (y)
   features = original_table.drop(columns=[label_column_name])
   labels = original_table[label_column_name]
   
   # Split into training and testing sets
-  from sklearn.model_selection import train_test_split
   X_train, X_test, y_train, y_test = train_test_split(
       features, labels, test_size=ts, random_state=rs, stratify=labels
   )
@@ -1225,10 +1869,13 @@ def dataset_setup(original_table, label_column_name:str, the_transformer, rs, ts
   # Apply transformer to testing data (using the fitted transformer)
   X_test_transformed = the_transformer.transform(X_test)
   
-  # Convert to numpy arrays
-  x_train_numpy = X_train_transformed.to_numpy()
-  x_test_numpy = X_test_transformed.to_numpy()
+  # Convert to numpy arrays (a transformer ending in a return_numpy step already gives arrays)
+  x_train_numpy = X_train_transformed if isinstance(X_train_transformed, np.ndarray) else X_train_transformed.to_numpy()
+  x_test_numpy = X_test_transformed if isinstance(X_test_transformed, np.ndarray) else X_test_transformed.to_numpy()
   y_train_numpy = y_train.to_numpy()
   y_test_numpy = y_test.to_numpy()
-  
-  return x_train_numpy, x_test_numpy, y_train_numpy, y_test_numpy
+
+  # Holding the objects themselves keeps their ids from being reused by new objects while cached
+  result = (x_train_numpy, x_test_numpy, y_train_numpy, y_test_numpy)
+  _setup_cache[key] = (original_table, the_transformer, result)
+  return result